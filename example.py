@@ -31,32 +31,17 @@ def __download_events():
 def __use_saved_events():
     return Events.parse_from_file(json_path='parsers/events.json', schema=s, inital_parser='mixpanel')
 
-def function_that_i_want_to_execute_inside_loop(**kwargs):
-    # MUST CONTAIN **KWARGS
-    # | **kwargs contains following variables:
-    #                n
-    #                event
-    #                events
-    #                driver
-    #                last_location
-    #                last_timestamp
-
-    n = kwargs['n']
-
-    driver = kwargs['driver']
-
-    event = kwargs['event']
-    events = kwargs['events']
-
-    last_location = kwargs['last_location']
+def function_that_i_want_to_execute_inside_loop(n, event, next_event, driver, last_location):
+    # MUST ACCEPT FOLLOWING POSITIONAL ARGUMENTS:
+    #                n             - number of the event (starting from 1)
+    #                event         - the parsed event
+    #                next_event    - the next parsed event or None if this is the last one
+    #                driver        - the Selenium WebDriver instance
+    #                last_location - page of the previous event
 
     print(event)
 
-    if last_location != event['page'] or (
-            last_location != event['page'] and
-            events.get(n + 1) and
-            (event['name'] == 'Button clicked' and events.get(n + 1)['name'] == 'Page viewed')
-        ):
+    if last_location != event['page']:
         driver.get(event['page'])
 
 # events = __download_events() or events = __use_saved_events()
@@ -2,7 +2,7 @@
 # Code under MIT License
 # Basically, to use my code you just need to include my name and my e-mail wherever you use this code.
 
-from time import sleep
+from time import perf_counter, sleep
 from typing import Callable, Union
 
 from selenium import webdriver
@@ -45,7 +45,8 @@ class Controls:
         """
         
         try:
-            driver.execute_script(f"window.scrollTo(0, {pixels});")
+            # same script source on every call, so the browser can reuse its compiled version
+            driver.execute_script("window.scrollTo(0, arguments[0]);", pixels)
         except JavascriptException:
             print('Simulating scroll failed')
 
@@ -63,7 +64,7 @@ class UserSimulation:
         """
 
         self.events = parsed_events
-        self.first_event = next(iter(self.events.items()))[1]
+        self.first_event = self.events.parsed_events[0]
         
         options = Options()
         options.add_experimental_option('excludeSwitches', ['enable-logging'])
@@ -88,49 +89,55 @@ class UserSimulation:
         Perform the simulation of user interactions based on parsed events.
 
         Args:
-            static_sleep_time (Union[int, float, None]): Static sleep time between events (seconds). If None then function will use time between each event.
-            execute_function (Union[None, Callable]): A custom function to execute during each event.
+            static_sleep_time (Union[int, float, None]): Static sleep time between events (seconds). If None then function will use time between each event, minus the time the previous event's actions took.
+            execute_function (Union[None, Callable]): A custom function to execute during each event, called as execute_function(n, event, next_event, driver, last_location).
         """
 
-        last_timestamp = self.first_event['time']
+        parsed_events = self.events.parsed_events
+        pages = self.events.pages
+        scroll_tops = self.events.scroll_tops
+        mouse_positions = self.events.mouse_positions
+        deltas = self.events.deltas
+        navigations = self.events.navigations
+
+        if not callable(execute_function):
+            execute_function = None
+
+        events_count = len(parsed_events)
         last_location = None
+        last_event_start = perf_counter()
 
-        for n, event in self.events.items():
+        for i, event in enumerate(parsed_events):
             if static_sleep_time is None:
-                next_event_in = event['time'] - last_timestamp
+                # time spent on the previous event's actions (e.g. page load) already counts towards the wait
+                wait = deltas[i] - (perf_counter() - last_event_start)
 
-                if next_event_in < 0:
-                    next_event_in = 3
-
-                sleep(next_event_in)
+                if wait > 0:
+                    sleep(wait)
             else:
                 sleep(static_sleep_time)
 
-            if execute_function is not None and callable(execute_function):
-                execute_function(
-                    n=n,
-                    event=event,
-                    events=self.events,
-                    driver=self.driver,
-                    last_location=last_location,
-                    last_timestamp=last_timestamp
-                )
+            last_event_start = perf_counter()
+
+            if execute_function is not None:
+                n = i + 1
+
+                execute_function(n, event, parsed_events[n] if n < events_count else None, self.driver, last_location)
             else:
-                if last_location != event['page']:
-                    self.driver.get(event['page'])
+                if navigations[i]:
+                    self.driver.get(pages[i])
             
-            if event.get('scroll_top'):
+            if scroll_tops[i]:
                 Controls.simulate_scroll(
                     driver=self.driver,
-                    pixels=event['scroll_top']
+                    pixels=scroll_tops[i]
                 )
 
-            if event.get('mouse_position'):
+            if mouse_positions[i]:
                 Controls.simulate_click(
                     driver=self.driver,
-                    x=event['mouse_position'][0],
-                    y=event['mouse_position'][1]
+                    x=mouse_positions[i][0],
+                    y=mouse_positions[i][1]
                 )
 
-            last_timestamp = event['time']
-            last_location = event['page']
+            last_location = pages[i]
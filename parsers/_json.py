@@ -0,0 +1,53 @@
+# Author: Maksymilian Sawicz (max.sawicz@gmail.com)
+# Code under MIT License
+# Basically, to use my code you just need to include my name and my e-mail wherever you use this code.
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSONDecodeError = json.JSONDecodeError # orjson.JSONDecodeError is a subclass of it
+
+
+def loads(data: Union[bytes, memoryview, str]) -> Any:
+    """
+    Deserialize JSON data, using orjson if it is installed.
+
+    Args:
+        data (Union[bytes, memoryview, str]): The JSON document.
+
+    Returns:
+        Any: The deserialized object.
+
+    Raises:
+        JSONDecodeError: If the data is not valid JSON.
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+
+    return json.loads(data)
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON, using orjson if it is installed.
+
+    Args:
+        obj (Any): The object to serialize.
+
+    Returns:
+        bytes: The serialized object.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,61 @@
+# Author: Maksymilian Sawicz (max.sawicz@gmail.com)
+# Code under MIT License
+# Basically, to use my code you just need to include my name and my e-mail wherever you use this code.
+
+# Kept free of classes and attribute lookups so the module can be compiled in place
+# (e.g. `cythonize -i parsers/_mixpanel_transform.py` or `mypyc parsers/_mixpanel_transform.py`);
+# the compiled extension is then imported instead of this file.
+
+from typing import List, Tuple, Union
+
+
+def transform_mixpanel_events(events: List[dict], field_pairs: List[Tuple[str, str]], time_key: Union[str, None], page_key: Union[str, None], query_key: Union[str, None], reproductive_data_key: Union[str, None]) -> Tuple[List[dict], list, list, list, list]:
+    """
+    Transform raw Mixpanel events into parsed events.
+
+    Args:
+        events (List[dict]): The raw Mixpanel events.
+        field_pairs (List[Tuple[str, str]]): Pairs of (parsed event field, property key) read from the reproductive data or the event properties.
+        time_key (Union[str, None]): The key for time data in event properties.
+        page_key (Union[str, None]): The key for page data in event properties.
+        query_key (Union[str, None]): The key for query data in event properties.
+        reproductive_data_key (Union[str, None]): The key for reproductive data in event properties.
+
+    Returns:
+        Tuple[List[dict], list, list, list, list]: The parsed events and their times, pages, scroll tops and mouse positions.
+    """
+
+    parsed_events = []
+    times = []
+    pages = []
+    scroll_tops = []
+    mouse_positions = []
+
+    for event in events:
+        properties = event['properties']
+
+        # reproductive data (if present) takes precedence over the event properties
+        source = properties.get(reproductive_data_key) or properties
+
+        parsed_event = {'name': event['event']}
+
+        for field, value in field_pairs:
+            parsed_event[field] = source.get(value)
+
+        time = properties.get(time_key)
+        page = properties.get(page_key)
+
+        if query_key and page and (query := properties.get(query_key)):
+            page = page + query
+
+        parsed_event['time'] = time
+        parsed_event['page'] = page
+
+        parsed_events.append(parsed_event)
+
+        times.append(time)
+        pages.append(page)
+        scroll_tops.append(parsed_event.get('scroll_top'))
+        mouse_positions.append(parsed_event.get('mouse_position'))
+
+    return parsed_events, times, pages, scroll_tops, mouse_positions
@@ -2,8 +2,13 @@
 # Code under MIT License
 # Basically, to use my code you just need to include my name and my e-mail wherever you use this code.
 
-import json
-from typing import Any, Dict
+import mmap
+import os
+import re
+from typing import Any, Iterator, List, Tuple, Union
+
+from parsers import _json
+from parsers._mixpanel_transform import transform_mixpanel_events
 
 
 class Variables:
@@ -11,18 +16,31 @@ class Variables:
     Class containing constant variables and configurations for the application.
 
     Attributes:
-        ALLOWED_PARSERS (tuple): A tuple of allowed parser names.
+        ALLOWED_PARSERS (frozenset): A set of allowed parser names.
+        NEGATIVE_DELTA_SLEEP_TIME (int): Sleep time (seconds) used when an event happened before the previous one or its time is missing.
     """
 
-    ALLOWED_PARSERS = (
+    ALLOWED_PARSERS = frozenset((
         'mixpanel',
-    )
+    ))
+
+    NEGATIVE_DELTA_SLEEP_TIME = 3
 
 class Schema:
     """
     Class representing the schema for parsing event data.
     """
 
+    __slots__ = (
+        'reproductive_data_key',
+        'dimension_key',
+        'scroll_top_key',
+        'mouse_position_key',
+        'time_key',
+        'page_key',
+        'query_key'
+    )
+
     def __init__(self, reproductive_data_key: str = None, dimension_key: str = None, scroll_top_key: str = None, mouse_position_key: str = None, time_key: str = None, page_key: str = None, query_key: str = None) -> None:
         """
         Initialize a Schema instance with schema keys.
@@ -49,7 +67,7 @@ class Schema:
         self.page_key = page_key
         self.query_key = query_key
 
-        if all((not value for value in self.__dict__.values())):
+        if all((not getattr(self, key) for key in self.__slots__)):
             raise ValueError('All arguments cannot be None')
         
     def return_schema(self) -> dict:
@@ -60,10 +78,10 @@ class Schema:
             dict: A dictionary containing schema attributes with non-None values.
         """
 
-        schema = {key: value for key, value in self.__dict__.items() if value is not None}
-        schema.pop('reproductive_data_key')
-
-        return schema
+        return {
+            key: value for key in self.__slots__
+            if key != 'reproductive_data_key' and (value := getattr(self, key)) is not None
+        }
 
 class Events:
     '''
@@ -88,15 +106,49 @@ class Events:
         self.schema = schema
 
         if inital_parser not in Variables.ALLOWED_PARSERS:
-            raise NotImplementedError(f'Inital parser "{inital_parser}" is not supported. Inital parser that are supported: {Variables.ALLOWED_PARSERS}')
+            raise NotImplementedError(f'Inital parser "{inital_parser}" is not supported. Inital parser that are supported: {tuple(sorted(Variables.ALLOWED_PARSERS))}')
         
-        self.PARSERS_AND_THEIR_FUNCTIONS = {
-            'mixpanel': Events.__mixpanel_inital_parser
-        }
+        self.parsed_events = []
+
+        # per-field columns of the parsed events, used by the simulation loop
+        self.times = []
+        self.pages = []
+        self.scroll_tops = []
+        self.mouse_positions = []
+        self.deltas = []
+        self.navigations = []
+
+    def __len__(self) -> int:
+        """
+        Return the number of parsed events.
+        """
+
+        return len(self.parsed_events)
+
+    def items(self) -> Iterator[Tuple[int, dict]]:
+        """
+        Iterate over the parsed events together with their 1-based numbers.
+
+        Returns:
+            Iterator[Tuple[int, dict]]: Pairs of (event number, parsed event).
+        """
+
+        return enumerate(self.parsed_events, 1)
+
+    def get(self, n: int) -> Union[dict, None]:
+        """
+        Return the parsed event with the given 1-based number.
+
+        Args:
+            n (int): The event number.
+
+        Returns:
+            Union[dict, None]: The parsed event or None if there is no such event.
+        """
 
-        self.parsed_events = {}
+        return self.parsed_events[n - 1] if 0 < n <= len(self.parsed_events) else None
 
-    def parse(self, schema: Schema) -> Any:
+    def parse(self, schema: Schema) -> 'Events':
         """
         Parse the event data using the provided schema.
 
@@ -104,12 +156,14 @@ class Events:
             schema (Schema): The schema for parsing the event data.
 
         Returns:
-            Any: The parsed event data.
+            Events: The instance itself, holding the parsed event data.
         """
 
         self.schema = schema
 
-        return self.__perfom_parsing()
+        self.__perfom_parsing()
+
+        return self
 
     @classmethod
     def parse_from_file(cls, json_path: str, schema: Schema, inital_parser: str = 'mixpanel'):
@@ -117,7 +171,7 @@ class Events:
         Parse event data from a JSON file using the provided schema and initial parser.
 
         Args:
-            json_path (str): The path to the JSON file containing event data.
+            json_path (str): The path to the JSON file containing event data (a JSON array or one event per line).
             schema (Schema): The schema for parsing the event data.
             inital_parser (str): The name of the initial parser to use.
 
@@ -128,13 +182,27 @@ class Events:
             ValueError: If the JSON file does not contain valid JSON data.
         """
 
-        with open(json_path, 'r', encoding='utf-8') as f:
-            _events = f.read()
-            
-            try:
-                _events = json.loads(_events)
-            except json.decoder.JSONDecodeError:
-                raise ValueError(f'File with the path "{json_path}" doesn\'t contain JSON data')
+        with open(json_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0: # empty files can't be memory-mapped
+                _events = []
+            else:
+                # parse straight from the page cache instead of copying the whole file into memory first
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'): # not available on Windows
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                    first_char = re.search(rb'\S', mm)
+
+                    try:
+                        if first_char is None:
+                            _events = []
+                        elif first_char.group() == b'[':
+                            with memoryview(mm) as data:
+                                _events = _json.loads(data)
+                        else: # newline-delimited JSON saved by MixpanelParser
+                            _events = [_json.loads(line) for line in iter(mm.readline, b'') if line.strip()]
+                    except _json.JSONDecodeError:
+                        raise ValueError(f'File with the path "{json_path}" doesn\'t contain JSON data')
 
         instance = cls(
             events=_events,
@@ -146,59 +214,68 @@ class Events:
 
         return instance
 
-    def __mixpanel_inital_parser(self) -> Dict:
+    def __mixpanel_inital_parser(self) -> List[dict]:
         """
         Parse event data using the Mixpanel initial parser.
 
         Returns:
-            Dict: The parsed event data.
+            List[dict]: The parsed event data.
+        """
+
+        # the schema doesn't change between events, so resolve its keys once
+        schema = self.schema.return_schema()
+
+        # time, page and query are always read from the event properties
+        field_pairs = [
+            (key.replace('_key', ''), value) for key, value in schema.items()
+            if key not in ('time_key', 'page_key', 'query_key')
+        ]
+
+        self.parsed_events, self.times, self.pages, self.scroll_tops, self.mouse_positions = transform_mixpanel_events(
+            events=self.events,
+            field_pairs=field_pairs,
+            time_key=schema.get('time_key'),
+            page_key=schema.get('page_key'),
+            query_key=schema.get('query_key'),
+            reproductive_data_key=self.schema.reproductive_data_key
+        )
+
+        self.__compute_deltas()
+        self.__compute_navigations()
+        
+        return self.parsed_events
+
+    def __compute_deltas(self) -> None:
+        """
+        Compute the time (seconds) to wait before each event, based on the time of the previous event.
         """
 
-        valid_event = 0
+        times = self.times
 
-        for event in self.events:
-            properties = event['properties']
+        self.deltas = [0] * len(times)
 
-            parsed_event = {'name': event['event']}
+        for i in range(1, len(times)):
+            try:
+                delta = times[i] - times[i - 1]
+            except TypeError: # missing or non-numeric time, e.g. a schema without time_key
+                delta = -1
 
-            schema = self.schema.return_schema()
+            self.deltas[i] = delta if delta >= 0 else Variables.NEGATIVE_DELTA_SLEEP_TIME
 
-            if (reproductive := properties.get(self.schema.reproductive_data_key)):
-                for key, value in schema.items():
-                    parsed_event[key.replace('_key', '')] = reproductive.get(value)
+    def __compute_navigations(self) -> None:
+        """
+        Mark the events that happen on a different page than the previous event (the first event does if it has a page).
+        """
 
-                parsed_event['time'] = properties.get(schema.get('time_key'))
-                parsed_event['page'] = properties.get(schema.get('page_key'))
+        pages = self.pages
 
-                if schema.get('query_key') and properties.get(schema.get('query_key')):
-                    parsed_event['page'] = parsed_event['page'] + properties.get(schema.get('query_key'))
-                
-                valid_event += 1
+        self.navigations = [True] * len(pages)
 
-                self.parsed_events[valid_event] = parsed_event
+        if pages:
+            self.navigations[0] = pages[0] is not None
 
-                parsed_event.pop('query')
-                
-                continue
-            else:
-                for key, value in schema.items():
-                    parsed_event[key.replace('_key', '')] = properties.get(value)
-
-                parsed_event['time'] = properties.get(schema.get('time_key'))
-                parsed_event['page'] = properties.get(schema.get('page_key'))
-                
-                if schema.get('query_key'):
-                    parsed_event['page'] = parsed_event['page'] + properties.get(schema.get('query_key'))
-                
-                valid_event += 1
-
-                parsed_event.pop('query')
-
-                self.parsed_events[valid_event] = parsed_event
-                
-                continue
-        
-        return self.parsed_events
+        for i in range(1, len(pages)):
+            self.navigations[i] = pages[i] != pages[i - 1]
 
     def __perfom_parsing(self) -> Any:
         """
@@ -207,9 +284,15 @@ class Events:
         Returns:
             Any: The parsed event data.
 
+        Raises:
+            NotImplementedError: If the specified initial parser is not supported.
+
         """
 
-        return self.PARSERS_AND_THEIR_FUNCTIONS[self.inital_parser](self)
+        if self.inital_parser == 'mixpanel':
+            return self.__mixpanel_inital_parser()
+
+        raise NotImplementedError(f'Inital parser "{self.inital_parser}" is not supported. Inital parser that are supported: {tuple(sorted(Variables.ALLOWED_PARSERS))}')
 
 if __name__ == "__main__":
     s = Schema('reproductive', 'dimension', 'scrollTop', 'mousePosition', 'time', 'location', 'searchArgs')
@@ -2,15 +2,23 @@
 # Code under MIT License
 # Basically, to use my code you just need to include my name and my e-mail wherever you use this code.
 
-import json
+import os
 import re
+import shutil
+import tempfile
 from base64 import b64encode
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import IO, Iterable, Iterator, List, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from parsers import _json
 from parsers.events import Events, Schema
 
+DATE_REGEX = re.compile(r'^(?:19|20)\d\d-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])$')
+
 
 class MixpanelParser:
     """
@@ -30,6 +38,14 @@ class MixpanelParser:
 
         """
 
+        SUPPORTED_PARAMS = frozenset((
+            'from_date',
+            'to_date',
+            'limit',
+            'event',
+            'where'
+        ))
+
         def __init__(self, **kwargs) -> None:
             """
             Initialize DataParams instance with specified parameters and perform validation checks.
@@ -43,71 +59,52 @@ class MixpanelParser:
 
             """
 
-            self.SUPPORTED_PARAMS = (
-                'from_date',
-                'to_date',
-                'limit',
-                'event',
-                'where'
-            )
+            self._validate(kwargs)
 
-            DATE_REGEX = r'^(?:19|20)\d\d-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])$'
-
-            self.PARAMS_CHECKS = {
-                'from_date': {
-                    'functions': ({
-                            'function': lambda date: re.search(DATE_REGEX, date) is not None,
-                            'error': 'from_date param should be in the following pattern: YYYY-MM-DD | You provided {user_input}'
-                        },
-                        {
-                            'function': lambda _: bool(kwargs.get('to_date')),
-                            'error': 'from_date param have to be with to_date param'
-                        }
-                    )
-                },
-                'to_date': {
-                    'functions': ({
-                            'function': lambda date: re.search(DATE_REGEX, date) is not None,
-                            'error': 'to_date param should be in the following pattern: YYYY-MM-DD | You provided {user_input}'
-                        },
-                        {
-                            'function': lambda _: bool(kwargs.get('from_date')),
-                            'error': 'to_date param have to be with from_date param'
-                        }
-                    )
-                },
-                'limit': {
-                    'functions': ({
-                            'function': lambda limit: isinstance(limit, int),
-                            'error': 'limit param should be integer'
-                        },
-                    )
-                },
-                'event': {
-                    'functions': ({
-                            'function': lambda event: isinstance(event, list),
-                            'error': 'event param should be list',
-                            'custom_result': lambda event: json.dumps(event, ensure_ascii=False)
-                        },
-                    )
-                },
-                'where': { # https://developer.mixpanel.com/reference/segmentation-expressions#examples
-                    'functions': ()
-                }
-            }
-
-            for key, value in kwargs.items():
-                if key not in self.SUPPORTED_PARAMS:
-                    raise NotImplementedError(f'"{key}" is not supported param. Supported params are {self.SUPPORTED_PARAMS}')
-                
-                for data in self.PARAMS_CHECKS[key]['functions']:
-                    if data['function'](value) is not True:
-                        raise ValueError(data['error'].format(user_input=value))
-                    
-                    if data.get('custom_result'):
-                        kwargs[key] = data['custom_result'](value)
-                
             self.params = kwargs
+
+        @classmethod
+        def _validate(cls, kwargs: dict) -> None:
+            """
+            Validate data download parameters, converting the values that need it in place.
+
+            Args:
+                kwargs (dict): Data download parameters.
+
+            Raises:
+                NotImplementedError: If an unsupported parameter is provided.
+                ValueError: If a parameter fails validation checks.
+
+            """
+
+            for key in kwargs:
+                if key not in cls.SUPPORTED_PARAMS:
+                    raise NotImplementedError(f'"{key}" is not supported param. Supported params are {tuple(sorted(cls.SUPPORTED_PARAMS))}')
+
+            if 'from_date' in kwargs:
+                if DATE_REGEX.match(kwargs['from_date']) is None:
+                    raise ValueError(f'from_date param should be in the following pattern: YYYY-MM-DD | You provided {kwargs["from_date"]}')
+
+                if not kwargs.get('to_date'):
+                    raise ValueError('from_date param have to be with to_date param')
+
+            if 'to_date' in kwargs:
+                if DATE_REGEX.match(kwargs['to_date']) is None:
+                    raise ValueError(f'to_date param should be in the following pattern: YYYY-MM-DD | You provided {kwargs["to_date"]}')
+
+                if not kwargs.get('from_date'):
+                    raise ValueError('to_date param have to be with from_date param')
+
+            if 'limit' in kwargs and not isinstance(kwargs['limit'], int):
+                raise ValueError('limit param should be integer')
+
+            if 'event' in kwargs:
+                if not isinstance(kwargs['event'], list):
+                    raise ValueError('event param should be list')
+
+                kwargs['event'] = _json.dumps(kwargs['event']).decode('utf-8')
+
+            # "where" is passed as is, see https://developer.mixpanel.com/reference/segmentation-expressions#examples
     
     def __init__(self, project_id: int, service_account_username: str, service_account_secret: str) -> None:
         """
@@ -125,6 +122,16 @@ class MixpanelParser:
         self.service_account_username = service_account_username
         self.service_account_secret = service_account_secret
 
+        self._auth_header = self._authorization_as_base64()
+
+        # reuse connections (and their TLS handshakes) between downloads
+        self._session = requests.Session()
+        self._mount_adapter(pool_size=4)
+        self._session.headers.update({
+            "accept": "application/json",
+            "authorization": self._auth_header
+        })
+
     def download_data(self, data_params: DataParams, data_location: str = 'data-eu', json_path: Union[str, None] = 'events.json') -> Events:
         """
         Download event data from Mixpanel using specified parameters and save it to a JSON file.
@@ -139,81 +146,207 @@ class MixpanelParser:
 
         """
 
-        url = f"https://{data_location}.mixpanel.com/api/2.0/export"
+        if json_path is None:
+            data = self._download_events(
+                params=data_params.params,
+                data_location=data_location
+            )
+        else:
+            with self._open_json_file(json_path) as json_file:
+                data = self._download_events(
+                    params=data_params.params,
+                    data_location=data_location,
+                    json_file=json_file
+                )
 
-        headers = {
-            "accept": "application/json",
-            "authorization": self._authorization_as_base64()
-        }
+        return Events(
+            events=data,
+            inital_parser='mixpanel'
+        )
 
-        params = data_params.params
+    def download_data_range(self, days: List[str], data_params: Union[DataParams, None] = None, data_location: str = 'data-eu', json_path: Union[str, None] = 'events.json', max_workers: int = 4) -> Events:
+        """
+        Download event data from Mixpanel for each of the given days in parallel (one request per day) and save it to a JSON file.
 
-        params['project_id'] = self.project_id
+        Args:
+            days (List[str]): The days (YYYY-MM-DD) to download event data for.
+            data_params (Union[MixpanelParser.DataParams, None]): Data parameters applied to every day. Its from_date and to_date are replaced by each day.
+            data_location (str): Mixpanel data location (default is 'data-eu').
+            json_path (Union[str, None]): The path to save the downloaded data as a JSON file (default is 'events.json').
+            max_workers (int): The maximum number of days downloaded at the same time (default is 4). Days are downloaded in chunks of this size.
 
-        response = requests.get(url,
-            headers=headers,
-            params=params
-        )
+        Returns:
+            Events: An instance of the Events class containing parsed event data of all days, in the order of the days.
 
-        data = self._extract_events_from_response(
-            data=response.text
-        )
+        """
 
-        if json_path is not None:
-            self._save_response_data_to_json(
-                json_path=json_path,
-                data=data
-            )
+        base_params = data_params.params if data_params is not None else {}
+
+        days_params = [
+            {**base_params, **self.DataParams(from_date=day, to_date=day).params} for day in days
+        ]
+
+        # every worker needs its own pooled connection, otherwise urllib3 discards the extra ones
+        if max_workers > self._pool_size:
+            self._mount_adapter(pool_size=max_workers)
+
+        days_data = []
+
+        with ExitStack() as output_stack, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            output_file = output_stack.enter_context(self._open_json_file(json_path)) if json_path is not None else None
+
+            # days are downloaded in chunks of max_workers, so at most max_workers temporary files are open at once
+            for start in range(0, len(days_params), max_workers):
+                chunk_params = days_params[start:start + max_workers]
+
+                with ExitStack() as stack:
+                    # every day is saved to its own temporary file, so the workers don't wait for each other;
+                    # the stack closes all of them, also when one of the downloads fails
+                    json_files = [
+                        stack.enter_context(tempfile.TemporaryFile()) if output_file is not None else None for _ in chunk_params
+                    ]
+
+                    days_data.extend(executor.map(
+                        lambda params, json_file: self._download_events(params=params, data_location=data_location, json_file=json_file),
+                        chunk_params,
+                        json_files
+                    ))
+
+                    if output_file is not None:
+                        for json_file in json_files:
+                            json_file.seek(0)
+                            shutil.copyfileobj(json_file, output_file)
 
         return Events(
-            events=data,
+            events=[event for day_data in days_data for event in day_data],
             inital_parser='mixpanel'
         )
 
-    def _authorization_as_base64(self) -> str:
+    @staticmethod
+    @contextmanager
+    def _open_json_file(json_path: str) -> Iterator[IO[bytes]]:
         """
-        Encode Mixpanel service account credentials as base64 for authorization.
+        Open a temporary binary file next to json_path that replaces json_path only if the block completes without an error.
 
-        Returns:
-            str: The authorization header as a base64-encoded string.
+        Args:
+            json_path (str): The path to save the JSON file.
+
+        Yields:
+            IO[bytes]: The temporary file to write to.
 
         """
 
-        string_to_encode = f'{self.service_account_username}:{self.service_account_secret}'.encode()
-        base64_string = b64encode(string_to_encode).decode()
+        json_file = tempfile.NamedTemporaryFile(dir=os.path.dirname(json_path) or '.', delete=False)
 
-        return f'Basic {base64_string}'
-    
-    def _save_response_data_to_json(self, json_path: str, data: str) -> None:
+        try:
+            with json_file:
+                yield json_file
+
+            # NamedTemporaryFile is created owner-only, keep the permissions a plain open() would give
+            try:
+                mode = os.stat(json_path).st_mode & 0o7777
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+
+                mode = 0o666 & ~umask
+
+            os.chmod(json_file.name, mode)
+            os.replace(json_file.name, json_path)
+        except BaseException:
+            # keep the previously saved file instead of leaving a partial download in its place
+            os.unlink(json_file.name)
+
+            raise
+
+    def _mount_adapter(self, pool_size: int) -> None:
         """
-        Save downloaded event data as a JSON file.
+        Mount an HTTPS adapter keeping up to pool_size connections per host open for reuse.
 
         Args:
-            json_path (str): The path to save the JSON file.
-            data (str): The event data to be saved.
+            pool_size (int): The maximum number of pooled connections per host.
 
         """
 
-        with open(json_path, 'w', encoding='utf-8') as f:
-            f.write(
-                json.dumps(data, indent=4)
+        previous_adapter = self._session.adapters.get('https://')
+
+        self._pool_size = pool_size
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=pool_size))
+
+        if previous_adapter is not None:
+            previous_adapter.close()
+
+    def _download_events(self, params: dict, data_location: str, json_file: Union[IO[bytes], None] = None) -> List[dict]:
+        """
+        Download events from the Mixpanel export API.
+
+        Args:
+            params (dict): Validated data download parameters.
+            data_location (str): Mixpanel data location.
+            json_file (Union[IO[bytes], None]): A binary file the raw response lines are written to (one event per line).
+
+        Returns:
+            List[dict]: A list of dictionaries representing individual events.
+
+        Raises:
+            requests.HTTPError: If Mixpanel responds with an error status (e.g. rate limit).
+
+        """
+
+        url = f"https://{data_location}.mixpanel.com/api/2.0/export"
+
+        with self._session.get(url,
+            params={**params, 'project_id': self.project_id},
+            stream=True
+        ) as response:
+            # an error body would otherwise be parsed and saved as an event
+            response.raise_for_status()
+
+            return self._extract_events_from_response(
+                lines=response.iter_lines(chunk_size=65536),
+                json_file=json_file
             )
 
-    def _extract_events_from_response(self, data: str) -> List[dict]:
+    def _authorization_as_base64(self) -> str:
+        """
+        Encode Mixpanel service account credentials as base64 for authorization.
+
+        Returns:
+            str: The authorization header as a base64-encoded string.
+
+        """
+
+        string_to_encode = f'{self.service_account_username}:{self.service_account_secret}'.encode()
+        base64_string = b64encode(string_to_encode).decode()
+
+        return f'Basic {base64_string}'
+
+    def _extract_events_from_response(self, lines: Iterable[bytes], json_file: Union[IO[bytes], None] = None) -> List[dict]:
         """
         Extract events from the Mixpanel API response.
 
         Args:
-            data (str): The raw API response data.
+            lines (Iterable[bytes]): The lines of the newline-delimited JSON response, parsed as they arrive.
+            json_file (Union[IO[bytes], None]): A binary file the raw lines are written to, as they are already valid JSON.
 
         Returns:
             List[dict]: A list of dictionaries representing individual events.
 
         """
 
-        return [
-            json.loads(event) for event in data.splitlines()
-        ]
+        if json_file is None:
+            return [
+                _json.loads(line) for line in lines if line
+            ]
+
+        events = []
+
+        for line in lines:
+            if line:
+                json_file.write(line + b'\n')
+                events.append(_json.loads(line))
+
+        return events
 
 if __name__ == "__main__":
     m = MixpanelParser(
@@ -234,4 +367,4 @@ if __name__ == "__main__":
 
     s = Schema('reproductive', 'dimension', 'scrollTop', 'mousePosition', 'time', 'location')
 
-    print(events.parse(s))
\ No newline at end of file
+    print(events.parse(s).parsed_events)
\ No newline at end of file